@@ -3,9 +3,60 @@ Functions and class for data extraction.
 """
 
 # Import libraries
-import struct
+import mmap
+import os
 import numpy as np
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# liburing is optional (Linux only). Needed for the `iouring` method.
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+# cupy and kvikio are optional. Needed for the `gds` (GPUDirect
+# Storage) method on systems with NVIDIA GPUs and fast NVMe.
+try:
+    import cupy
+except ImportError:
+    cupy = None
+try:
+    import kvikio
+except ImportError:
+    kvikio = None
+
+# numba is optional. When available, the extraction loops are
+# JIT-compiled to native code; otherwise NumPy fallbacks are used.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _extract_slice(view_f32, nx, nxsl, nysl, nxskip, nyskip, out_slice):
+        """
+        JIT-compiled kernel to subsample one z-slice of the subcube from
+        a float32 view of the enclosing contiguous block.
+        """
+        for j in range(nysl):
+            for i in range(nxsl):
+                out_slice[j, i] = view_f32[j*nyskip*nx + i*nxskip]
+
+    @njit(parallel=True, cache=True)
+    def _extract_cube(data_flat, nx, ny, init_idx, nxsl, nysl, nzsl, nxskip, nyskip, nzskip, out):
+        """
+        JIT-compiled parallel kernel to subsample the full subcube from
+        a flat float32 view of the raw data. The outermost z-loop is a
+        prange: each thread streams its own z-slabs.
+        """
+        for k in prange(nzsl):
+            base_k = init_idx + k*nzskip*nx*ny
+            for j in range(nysl):
+                base_j = base_k + j*nyskip*nx
+                for i in range(nxsl):
+                    out[k, j, i] = data_flat[base_j + i*nxskip]
 
 def check_data(loadpath, nx, ny, nz, nbyte):
     """
@@ -20,10 +71,8 @@ def check_data(loadpath, nx, ny, nz, nbyte):
         nbyte: # bytes per data in file. 4 bytes = 8 hex characters = 32-bit little endian
     """
     print('Checking data file...')
-    # read in test binary and check number of samples
-    binary = open(loadpath, 'rb')
-    binary.seek(0,2) ## seeks to the end of the file (needed for getting number of bytes)
-    num_bytes = binary.tell() ## how many bytes are in this file is stored as num_bytes
+    # stat the binary and check number of samples (no need to open it)
+    num_bytes = os.stat(loadpath).st_size ## how many bytes are in this file is stored as num_bytes
     print(f'Number of bytes in file =\t{num_bytes:,}')
     print(f'Number of counted samples =\t{int(num_bytes/nbyte):,}')
     print(f'Number of actual samples =\t{nx*ny*nz:,}')
@@ -32,7 +81,6 @@ def check_data(loadpath, nx, ny, nz, nbyte):
         print(f'Number of samples counted == actual. Check complete.')
     else:
         raise Exception(f'Number of samples counted != actual')
-    binary.close()
 
 def get_1Dgrid(Lh, nx, nxoffset, nxsl, nxskip):
     """
@@ -51,20 +99,22 @@ def get_1Dgrid(Lh, nx, nxoffset, nxsl, nxskip):
     """
     dx = Lh/nx
     xin = 0 + (dx*nxoffset)
-    xfi = xin + dx*nxsl*nxskip
-    x = np.linspace(xin, xfi, nxsl)
+    # grid points at exact multiples of the sampled spacing dx*nxskip.
+    # linspace over [xin, xin + dx*nxsl*nxskip] would use the stretched
+    # step dx*nxskip*nxsl/(nxsl-1) and misplace every interior point.
+    x = xin + (dx*nxskip)*np.arange(nxsl, dtype=np.float64)
     return x
 
-def get_data(method, loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte):
+def get_data(method, loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte, scale_axis=None, scale_vec=None, nthreads=1):
     """
     Function to extract subdomain using a specified method.
-    
+
     Args:
         method: Data loading method
         loadpath: Path to raw data
-        nx: # grid points of raw data in x-direction 
-        ny: # grid points of raw data in y-direction 
-        nz: # grid points of raw data in z-direction 
+        nx: # grid points of raw data in x-direction
+        ny: # grid points of raw data in y-direction
+        nz: # grid points of raw data in z-direction
         nxsl: # grid points in x dir of sampled data
         nysl: # grid points in y dir of sampled data
         nzsl: # grid points in z dir of sampled data
@@ -75,29 +125,50 @@ def get_data(method, loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset,
         nyskip: Subsampling rate used in y dir
         nzskip: Subsampling rate used in z dir
         nbyte: # bytes per data in file. 4 bytes = 8 hex characters = 32-bit little endian
+        scale_axis: Optional axis ('y' or 'z') along which to scale the data
+                    (e.g. ambient density for perturbation density 'r')
+        scale_vec: Scale factor per grid point along `scale_axis` (length nysl or nzsl)
+        nthreads: # CPU threads for the memmap slab copies
 
     Returns:
-        datacube: 3D subdomain from raw data for given grid resolution specifications
+        datacube: 3D subdomain from raw data for given grid resolution
+                  specifications, stored [z, y, x] (matching the on-disk order)
     """
     if method == "seek":
         # using seek-type operation
         datacube = get_data_single_points(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte)
     elif method == "memmap":
-        # using memmap
-        datacube = get_data_memmap(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip)
+        # using memmap. The scaling is fused into the slab copies.
+        return get_data_memmap(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, scale_axis=scale_axis, scale_vec=scale_vec, nthreads=nthreads)
     elif method == "fromfile":
         # using fromfile loader
         datacube = get_data_fromfile(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte)
+    elif method == "iouring":
+        # using io_uring batched reads (Linux only)
+        datacube = get_data_iouring(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte)
+    elif method == "numba":
+        # using a Numba parallel kernel over a memory-mapped view
+        datacube = get_data_numba(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip)
+    elif method == "gds":
+        # using GPUDirect Storage reads + CuPy subsampling on the GPU
+        datacube = get_data_gds(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte)
     else:
         raise NotImplementedError
+    # For the other methods, apply the scaling in place (no extra
+    # cube-sized allocation, unlike a `datacube * scalar` expression)
+    if scale_axis == 'y':
+        datacube *= scale_vec.reshape(1, nysl, 1)
+    elif scale_axis == 'z':
+        datacube *= scale_vec.reshape(nzsl, 1, 1)
     return datacube
    
 # Different functions to get data from binary file
 def get_data_single_points(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte):
     """
     Get data using Python's `open` file function and `seek` operation.
-    NOTE: A single item is read at a time using this procedure. Not
-    efficient to extract large subcubes.
+    NOTE: One contiguous block enclosing the subsampled points is read
+    per z-slice and subsampled in memory with NumPy, instead of reading
+    a single item at a time (which is interpreter-bound for large subcubes).
     
     Args:
         loadpath: Path to raw data
@@ -124,33 +195,31 @@ def get_data_single_points(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyo
     nzoff = nzoffset * (nx*ny*nbyte)
     # initial corner of the cuboid
     init = nzoff + nyoff + nxoff
-    m = 0 # for sample counting
-    datacube = np.zeros(nxsl*nysl*nzsl)
+    datacube = np.empty((nzsl, nysl, nxsl), dtype=np.float32)
+    # number of samples in the contiguous block enclosing one subsampled z-slice
+    nblock = (nysl-1)*nyskip*nx + (nxsl-1)*nxskip + 1
+    # indices of the subsampled points within one block
+    idx_slice = (np.arange(nysl)*nyskip*nx)[:,None] + np.arange(nxsl)*nxskip
     t = time.time()
     binary = open(loadpath, 'rb')
-    nyshift = 0   # to shift a slice of nx*ny
     for k in range(0,nzsl):
-        nxshift = 0  # to shift a row of nx. Reset to 0 after 1 slice of nx*ny
-        for j in range(0,nysl):
-            for i in range(0,nxsl):
-                pos = init + ((i*nxskip)*nbyte) + nxshift + nyshift
-                binary.seek(pos,0)
-                datacube[m] = struct.unpack("<f", binary.read(nbyte))[0]
-                m += 1
-            nxshift += (nx*nyskip)*nbyte  # shift 1 row of nx for every ny
-        nyshift += ((nx*ny)*nzskip)*nbyte  # shift 1 slice of nx*ny for every nz
+        pos = init + ((k*nzskip)*nx*ny)*nbyte  # shift k slices of nx*ny
+        binary.seek(pos,0)
+        buf = binary.read(nblock*nbyte)  # one bulk read of the enclosing block
+        view = np.frombuffer(buf, dtype='<f4')
+        if njit is not None:
+            # JIT-compiled stride loop: plain native loads, no index array
+            _extract_slice(view, nx, nxsl, nysl, nxskip, nyskip, datacube[k])
+        else:
+            datacube[k] = view[idx_slice]
     binary.close()
     elpsdt = time.time() - t
     print(f'Time elapsed for loading datacube: {int(elpsdt/60)} min {elpsdt%60:.2f} sec')
-    # reshape 1-D to 3-D array
-    datacube = datacube.reshape(nzsl,nysl,nxsl)
-    # transpose x & z dimensions
-    datacube = datacube.transpose(2,1,0)
     # Print the shape of the sub-cube
     print(f'Shape of the sub-cube: {datacube.shape}')
     return datacube
 
-def get_data_memmap(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip):
+def get_data_memmap(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, scale_axis=None, scale_vec=None, nthreads=1):
     """
     Get data using numpy memmap function.
     NOTE: memmap outputs a file pointer accessing the binary data 
@@ -171,6 +240,9 @@ def get_data_memmap(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset,
         nyskip: Subsampling rate used in y dir
         nzskip: Subsampling rate used in z dir
         nbyte: # bytes per data in file. 4 bytes = 8 hex characters = 32-bit little endian
+        scale_axis: Optional axis ('y' or 'z') along which to scale the data
+        scale_vec: Scale factor per grid point along `scale_axis` (length nysl or nzsl)
+        nthreads: # CPU threads for the slab copies (each thread owns a disjoint z-range)
 
     Returns:
         datacube: 3D subdomain from raw data for given grid resolution specifications
@@ -178,32 +250,69 @@ def get_data_memmap(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset,
     # Memory-map the binary file
     t = time.time()
     data_memmap = np.memmap(loadpath, dtype=np.float32, mode='r', shape=(nz, ny, nx)) # NOTE: data is stored [z, y, x]
+    # Advise the kernel about the access pattern: the slab copies below
+    # stream x-rows sequentially, so aggressive readahead cuts
+    # page-fault stalls on cold caches. madvise is not available on
+    # all platforms (e.g. Windows), hence the guards.
+    if hasattr(data_memmap._mmap, 'madvise'):
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            data_memmap._mmap.madvise(mmap.MADV_WILLNEED)
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            data_memmap._mmap.madvise(mmap.MADV_SEQUENTIAL)
     elpsdt = time.time() - t
     print(f'Time elapsed for memmap: {int(elpsdt/60)} min {elpsdt%60:.4f} sec')
-    # Extract the sub-cube
-    t = time.time()
-    sub_cube = data_memmap[ nzoffset:nzoffset+(nzsl*nzskip):nzskip, # start from `nzoffset` location and get `nzsl` points, but skip every `nzskip` point
-                          nyoffset:nyoffset+(nysl*nyskip):nyskip, 
-                          nxoffset:nxoffset+(nxsl*nxskip):nxskip] 
-    elpsdt = time.time() - t
-    print(f'Time elapsed for slice: {int(elpsdt/60)} min {elpsdt%60:.4f} sec')
-    # Copy the sub-cube to a new array to avoid memory-mapping issues when processing
+    # Copy the sub-cube to a new array, one z-slab at a time, to avoid
+    # memory-mapping issues when processing. Copying the full strided
+    # slice in one go triggers a random-access gather across the whole
+    # file; per-slab copies stream contiguous x-rows from the memmap.
     t = time.time()
-    datacube = sub_cube.copy().transpose(2,1,0) # transposing data to be [x, y, z]
+    datacube = np.empty((nzsl, nysl, nxsl), dtype=np.float32)
+    # Build the strided sub-cube view once with explicit stride arithmetic,
+    # starting from the `n*offset` corner and skipping every `n*skip` point,
+    # instead of constructing a sliced memmap view inside the loop
+    itemsize = data_memmap.itemsize
+    sub_view = np.lib.stride_tricks.as_strided(
+        data_memmap[nzoffset:, nyoffset:, nxoffset:],
+        shape=(nzsl, nysl, nxsl),
+        strides=(nzskip*ny*nx*itemsize, nyskip*nx*itemsize, nxskip*itemsize))
+    def _copy_slabs(k0, k1):
+        for k in range(k0, k1):
+            slab = np.asarray(sub_view[k])
+            # fuse the optional scaling into the copy: one pass over the
+            # data instead of a separate cube-sized multiply afterwards
+            if scale_axis == 'y':
+                datacube[k] = slab * scale_vec[:,None]
+            elif scale_axis == 'z':
+                datacube[k] = slab * scale_vec[k]
+            else:
+                datacube[k] = slab
+    if nthreads > 1:
+        # each thread copies a disjoint z-range; page-fault reads from the
+        # memmap and the array stores both release the GIL, so the slab
+        # copies overlap on multi-queue storage
+        bounds = np.linspace(0, nzsl, nthreads+1, dtype=int)
+        with ThreadPoolExecutor(max_workers=nthreads) as ex:
+            futures = [ex.submit(_copy_slabs, bounds[i], bounds[i+1]) for i in range(nthreads)]
+            for future in futures:
+                future.result()
+    else:
+        _copy_slabs(0, nzsl)
     elpsdt = time.time() - t
     print(f'Time elapsed for copying data: {int(elpsdt/60)} min {elpsdt%60:.4f} sec')
     data_memmap._mmap.close()
-    del data_memmap, sub_cube
+    del data_memmap
     # Print the shape of the sub-cube
     print(f'Shape of the sub-cube: {datacube.shape}')
     return datacube
 
 def get_data_fromfile(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte):
     """
-    Get data using numpy fromfile function. 
-    NOTE: fromfile reads the `count` # of items (of type `dtype`) 
-    in a continous manner of memory storage.
-    
+    Get data using positioned reads (`os.pread`), one read per x-row
+    of the subcube.
+    NOTE: when adjacent rows of a z-slice are back-to-back on disk
+    (nxsl*nxskip == nx*nyskip), a single vectored `os.preadv` scatters
+    the whole slice into the row buffers with one syscall.
+
     Args:
         loadpath: Path to raw data
         nx: # grid points of raw data in x-direction 
@@ -229,21 +338,205 @@ def get_data_fromfile(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset
     nzoff = nzoffset * (nx*ny*nbyte)
     # initial corner of the cuboid
     init = nzoff + nyoff + nxoff
-    datacube = np.zeros((nxsl, nysl, nzsl))
+    datacube = np.empty((nzsl, nysl, nxsl), dtype=np.float32)
+    t = time.time()
+    # byte offset of each x-row of the subcube, computed in one vectorized op
+    offsets = init + nbyte*(np.arange(nzsl)[:,None]*nzskip*nx*ny + np.arange(nysl)[None,:]*nyskip*nx)
+    rowbytes = nxsl*nxskip*nbyte
+    # rows of one z-slice are contiguous on disk when the read length
+    # equals the row spacing; then one preadv scatters the whole slice
+    contiguous = hasattr(os, 'preadv') and nxsl*nxskip == nx*nyskip
+    if contiguous:
+        rowbufs = [bytearray(rowbytes) for _ in range(nysl)]
+    # Open the file once and reuse the handle; reopening per row adds
+    # an open()+fstat() syscall pair for every (j,k) pair
+    fd = os.open(loadpath, os.O_RDONLY)
+    try:
+        for k in range(0,nzsl):
+            if contiguous:
+                os.preadv(fd, rowbufs, offsets[k,0])  # one scatter read per slice
+                for j in range(0,nysl):
+                    datacube[k, j, :] = np.frombuffer(rowbufs[j], dtype='<f4')[::nxskip]
+            else:
+                for j in range(0,nysl):
+                    row = os.pread(fd, rowbytes, offsets[k,j])
+                    datacube[k, j, :] = np.frombuffer(row, dtype='<f4')[::nxskip]
+    finally:
+        os.close(fd)
+    elpsdt = time.time() - t
+    print(f'Time elapsed for loading datacube: {int(elpsdt/60)} min {elpsdt%60:.2f} sec')
+    print(f'Shape of the sub-cube: {datacube.shape}')
+    return datacube
+
+def get_data_iouring(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte):
+    """
+    Get data using Linux io_uring batched reads (via the `liburing`
+    library).
+    NOTE: One read request is submitted per x-row of the subcube, in
+    batches of up to 1024, letting the kernel service the reads
+    asynchronously. Best suited for cold caches on fast NVMe storage.
+
+    Args:
+        loadpath: Path to raw data
+        nx: # grid points of raw data in x-direction
+        ny: # grid points of raw data in y-direction
+        nz: # grid points of raw data in z-direction
+        nxsl: # grid points in x dir of sampled data
+        nysl: # grid points in y dir of sampled data
+        nzsl: # grid points in z dir of sampled data
+        nxoffset: Offset these many samples in x dir to set corner of the sampled domain
+        nyoffset: Offset these many samples in y dir to set corner of the sampled domain
+        nzoffset: Offset these many samples in z dir to set corner of the sampled domain
+        nxskip: Subsampling rate used in x dir
+        nyskip: Subsampling rate used in y dir
+        nzskip: Subsampling rate used in z dir
+        nbyte: # bytes per data in file. 4 bytes = 8 hex characters = 32-bit little endian
+
+    Returns:
+        datacube: 3D subdomain from raw data for given grid resolution specifications
+    """
+    if liburing is None:
+        raise Exception('The iouring method requires the `liburing` library (Linux only). Install with `pip install liburing`')
+    # skip these many samples in each direction
+    nxoff = nxoffset * (nbyte)
+    nyoff = nyoffset * (nx*nbyte)
+    nzoff = nzoffset * (nx*ny*nbyte)
+    # initial corner of the cuboid
+    init = nzoff + nyoff + nxoff
+    # byte offset of each x-row of the subcube, in read order
+    offsets = (init + nbyte*(np.arange(nzsl)[:,None]*nzskip*nx*ny + np.arange(nysl)[None,:]*nyskip*nx)).ravel().tolist()
+    nrows = nysl*nzsl
+    rowbytes = nxsl*nxskip*nbyte
+    rows = [bytearray(rowbytes) for _ in range(nrows)]
     t = time.time()
-    nyshift = 0   # to shift a slice of nx*ny
+    fd = os.open(loadpath, os.O_RDONLY)
+    ring = liburing.Ring()
+    qd = min(1024, nrows)  # queue depth / batch size
+    liburing.io_uring_queue_init(qd, ring)
+    cqe = liburing.Cqe()
+    try:
+        m = 0
+        while m < nrows:
+            nbatch = min(qd, nrows-m)
+            # submit one read request per x-row in this batch
+            for i in range(nbatch):
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_read(sqe, fd, rows[m+i], offsets[m+i])
+            liburing.io_uring_submit_and_wait(ring, nbatch)
+            # drain the completions and check for short/failed reads
+            liburing.io_uring_wait_cqe(ring, cqe)
+            for i in range(nbatch):
+                if cqe[i].res != rowbytes:
+                    raise Exception(f'io_uring read failed or was short: res={cqe[i].res}, expected {rowbytes}')
+            liburing.io_uring_cq_advance(ring, nbatch)
+            m += nbatch
+    finally:
+        liburing.io_uring_queue_exit(ring)
+        os.close(fd)
+    # subsample each x-row into the output cube
+    datacube = np.empty((nzsl, nysl, nxsl), dtype=np.float32)
+    m = 0
     for k in range(0,nzsl):
-        nxshift = 0  # to shift a row of nx. Reset to 0 after 1 slice of nx*ny
         for j in range(0,nysl):
-            pos = init + nxshift + nyshift
-            datacube[:, j, k] = np.fromfile(loadpath, dtype=np.float32, count=nxsl*nxskip, offset=pos)[::nxskip]
-            nxshift += (nx*nyskip)*nbyte  # shift 1 row of nx for every ny
-        nyshift += ((nx*ny)*nzskip)*nbyte  # shift 1 slice of nx*ny for every nz
+            datacube[k, j, :] = np.frombuffer(rows[m], dtype='<f4')[::nxskip]
+            m += 1
     elpsdt = time.time() - t
     print(f'Time elapsed for loading datacube: {int(elpsdt/60)} min {elpsdt%60:.2f} sec')
     print(f'Shape of the sub-cube: {datacube.shape}')
     return datacube
 
+def get_data_gds(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip, nbyte):
+    """
+    Get data using GPUDirect Storage (via `kvikio`) reads straight into
+    GPU memory, with the subsampling done on the GPU by CuPy.
+    NOTE: only the contiguous block enclosing each subsampled z-slice is
+    read, one DMA transfer per slice, bypassing the CPU for the bulk
+    data movement. The subcube is returned as a host array.
+
+    Args:
+        loadpath: Path to raw data
+        nx: # grid points of raw data in x-direction
+        ny: # grid points of raw data in y-direction
+        nz: # grid points of raw data in z-direction
+        nxsl: # grid points in x dir of sampled data
+        nysl: # grid points in y dir of sampled data
+        nzsl: # grid points in z dir of sampled data
+        nxoffset: Offset these many samples in x dir to set corner of the sampled domain
+        nyoffset: Offset these many samples in y dir to set corner of the sampled domain
+        nzoffset: Offset these many samples in z dir to set corner of the sampled domain
+        nxskip: Subsampling rate used in x dir
+        nyskip: Subsampling rate used in y dir
+        nzskip: Subsampling rate used in z dir
+        nbyte: # bytes per data in file. 4 bytes = 8 hex characters = 32-bit little endian
+
+    Returns:
+        datacube: 3D subdomain from raw data for given grid resolution specifications
+    """
+    if cupy is None or kvikio is None:
+        raise Exception('The gds method requires the `cupy` and `kvikio` libraries. See https://docs.rapids.ai/api/kvikio/')
+    # initial corner of the cuboid
+    init = (nzoffset*(nx*ny) + nyoffset*nx + nxoffset) * nbyte
+    # number of samples in the contiguous block enclosing one subsampled z-slice
+    nblock = (nysl-1)*nyskip*nx + (nxsl-1)*nxskip + 1
+    # indices of the subsampled points within one block (on the GPU)
+    idx_slice = (cupy.arange(nysl)*nyskip*nx)[:,None] + cupy.arange(nxsl)*nxskip
+    gpucube = cupy.empty((nzsl, nysl, nxsl), dtype=cupy.float32)
+    block = cupy.empty(nblock, dtype=cupy.float32)
+    t = time.time()
+    with kvikio.CuFile(loadpath, 'r') as f:
+        for k in range(0,nzsl):
+            pos = init + ((k*nzskip)*nx*ny)*nbyte  # shift k slices of nx*ny
+            f.pread(block, nblock*nbyte, pos).get()  # wait for the DMA to finish
+            gpucube[k] = block[idx_slice]
+    # copy the subcube back to the host
+    datacube = gpucube.get()
+    elpsdt = time.time() - t
+    print(f'Time elapsed for loading datacube: {int(elpsdt/60)} min {elpsdt%60:.2f} sec')
+    # Print the shape of the sub-cube
+    print(f'Shape of the sub-cube: {datacube.shape}')
+    return datacube
+
+def get_data_numba(loadpath, nx, ny, nz, nxsl, nysl, nzsl, nxoffset, nyoffset, nzoffset, nxskip, nyskip, nzskip):
+    """
+    Get data using a Numba JIT-compiled parallel kernel over a flat
+    memory-mapped view of the binary file.
+    NOTE: the outermost z-loop runs across CPU threads, so each thread
+    streams its own z-slabs from the page cache with plain native loads.
+
+    Args:
+        loadpath: Path to raw data
+        nx: # grid points of raw data in x-direction
+        ny: # grid points of raw data in y-direction
+        nz: # grid points of raw data in z-direction
+        nxsl: # grid points in x dir of sampled data
+        nysl: # grid points in y dir of sampled data
+        nzsl: # grid points in z dir of sampled data
+        nxoffset: Offset these many samples in x dir to set corner of the sampled domain
+        nyoffset: Offset these many samples in y dir to set corner of the sampled domain
+        nzoffset: Offset these many samples in z dir to set corner of the sampled domain
+        nxskip: Subsampling rate used in x dir
+        nyskip: Subsampling rate used in y dir
+        nzskip: Subsampling rate used in z dir
+
+    Returns:
+        datacube: 3D subdomain from raw data for given grid resolution specifications
+    """
+    if njit is None:
+        raise Exception('The numba method requires the `numba` library. Install with `pip install numba`')
+    t = time.time()
+    # flat [z*y*x] float32 view of the file; the kernel does the stride math
+    data_memmap = np.memmap(loadpath, dtype=np.float32, mode='r')
+    init_idx = nzoffset*(nx*ny) + nyoffset*nx + nxoffset
+    datacube = np.empty((nzsl, nysl, nxsl), dtype=np.float32)
+    _extract_cube(data_memmap, nx, ny, init_idx, nxsl, nysl, nzsl, nxskip, nyskip, nzskip, datacube)
+    elpsdt = time.time() - t
+    print(f'Time elapsed for loading datacube: {int(elpsdt/60)} min {elpsdt%60:.2f} sec')
+    data_memmap._mmap.close()
+    del data_memmap
+    # Print the shape of the sub-cube
+    print(f'Shape of the sub-cube: {datacube.shape}')
+    return datacube
+
 # Data Class using functions from above
 class SSTData():
     def __init__(self, args):
@@ -280,15 +573,22 @@ class SSTData():
         
         self.loadpath = f'{args.rawdatadir}{self.var}{args.delimiter}{args.rawdatasnap}'
         self.method = args.method
-        
+        self.nthreads = args.nthreads
+        self._checked = False # whether the data file has been validated
+
     # Check data file
     def _check_data(self):
+        # skip re-validation on repeat calls (e.g. re-runs in notebooks)
+        if self._checked:
+            return
         check_data(self.loadpath, self.nx, self.ny, self.nz, self.nbyte)
+        self._checked = True
 
     # Extract data
-    def _get_data(self):
-        datacube = get_data(self.method, self.loadpath, self.nx, self.ny, self.nz, 
-                            self.nxsl, self.nysl, self.nzsl, self.nxoffset, self.nyoffset, self.nzoffset, 
-                            self.nxskip, self.nyskip, self.nzskip, self.nbyte)
+    def _get_data(self, scale_axis=None, scale_vec=None):
+        datacube = get_data(self.method, self.loadpath, self.nx, self.ny, self.nz,
+                            self.nxsl, self.nysl, self.nzsl, self.nxoffset, self.nyoffset, self.nzoffset,
+                            self.nxskip, self.nyskip, self.nzskip, self.nbyte,
+                            scale_axis=scale_axis, scale_vec=scale_vec, nthreads=self.nthreads)
         return datacube
       
@@ -1,5 +1,29 @@
+import matplotlib as mpl
 import numpy as np
 
+# numba is optional. When available, the color-limit reduction runs as
+# a single fused pass over the cube instead of separate min/max passes.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _minmax(a):
+        """
+        JIT-compiled single-pass min/max reduction over a 1D array.
+        """
+        mn = a[0]
+        mx = a[0]
+        for i in range(a.size):
+            v = a[i]
+            if v < mn:
+                mn = v
+            elif v > mx:
+                mx = v
+        return mn, mx
+
 def plot_contour_box(ax, x, y, z, datacube, gravity):
     """
     Plot contour box.
@@ -9,42 +33,81 @@ def plot_contour_box(ax, x, y, z, datacube, gravity):
         x: 1D grid in x-direction
         y: 1D grid in y-direction
         z: 1D grid in z-direction
-        datacube: 3D subdomain from raw data
+        datacube: 3D subdomain from raw data, stored [z, y, x]
         gravity: String denoting direction of gravity. 'y' or 'z'
     """
-    # Get meshgrid and set cmap
-    X, Y, Z = np.meshgrid(x,y,z, indexing='ij')
-    nxsl, nysl, nzsl = X.shape
-    clevels = np.linspace(datacube.min()*0.5, datacube.max()*0.5, 101)
+    # Get face coordinates and set cmap
+    nzsl, nysl, nxsl = datacube.shape
+    # 2D face coordinates as broadcast views of the 1D grids; avoids
+    # allocating three dense nxsl*nysl*nzsl meshgrids just to slice faces
+    Xxy = np.broadcast_to(x[:,None], (nxsl, nysl))
+    Yxy = np.broadcast_to(y[None,:], (nxsl, nysl))
+    Xxz = np.broadcast_to(x[:,None], (nxsl, nzsl))
+    Zxz = np.broadcast_to(z[None,:], (nxsl, nzsl))
+    Yyz = np.broadcast_to(y[:,None], (nysl, nzsl))
+    Zyz = np.broadcast_to(z[None,:], (nysl, nzsl))
+    # min and max of the cube in one traversal (two full passes otherwise)
+    if njit is not None:
+        dmin, dmax = _minmax(np.ravel(datacube, order='K'))
+    else:
+        dmin, dmax = datacube.min(), datacube.max()
+    clevels = np.linspace(dmin*0.5, dmax*0.5, 101)
     kw = {
-        'vmin': clevels.min(),
-        'vmax': clevels.max(),
+        'vmin': dmin*0.5,
+        'vmax': dmax*0.5,
         'levels': clevels,
         'cmap': 'RdBu_r',
         'extend': 'both'
     }
-    
+
     # Set limits of the plot from coord limits
-    xmin, xmax = X.min(), X.max()
-    ymin, ymax = Y.min(), Y.max()
-    zmin, zmax = Z.min(), Z.max()    
+    xmin, xmax = x.min(), x.max()
+    ymin, ymax = y.min(), y.max()
+    zmin, zmax = z.min(), z.max()
     # edge args for box
     edges_kw = dict(color='0.8', linewidth=0.5, zorder=1e3)
 
+    # contourf runs marching squares over every face once per level; for
+    # large faces, render each face as a single pre-colored surface instead
+    use_surface = max(nxsl*nysl, nxsl*nzsl, nysl*nzsl) > 128*128
+    norm = mpl.colors.Normalize(vmin=kw['vmin'], vmax=kw['vmax'], clip=True)
+    cmap = mpl.colormaps[kw['cmap']]
+
+    def _plot_face(cA, cB, face, zdir, offset):
+        """
+        Draw one box face on the plane `zdir`=`offset`. cA/cB are the
+        in-plane 2D coordinate arrays and `face` the 2D data.
+        """
+        if use_surface:
+            const = np.full(face.shape, offset)
+            if zdir == 'x':
+                coords = (const, cA, cB)
+            elif zdir == 'y':
+                coords = (cA, const, cB)
+            else:
+                coords = (cA, cB, const)
+            return ax.plot_surface(*coords, facecolors=cmap(norm(face)),
+                                   shade=False, rstride=1, cstride=1)
+        # mplot3d contourf convention: the data goes in the `zdir` slot
+        if zdir == 'x':
+            args = (face, cA, cB)
+        elif zdir == 'y':
+            args = (cA, face, cB)
+        else:
+            args = (cA, cB, face)
+        return ax.contourf(*args, zdir=zdir, offset=offset, **kw)
+
     if gravity == 'z':
+        # Materialize each face once: matplotlib traverses the data
+        # several times (levels, norm), and the transposed views would
+        # re-gather with large strides on every pass
+        face_y = np.ascontiguousarray(datacube[:, 0, :].T)
+        face_z = np.ascontiguousarray(datacube[-1, :, :].T)
+        face_x = np.ascontiguousarray(datacube[:, :, -1].T)
         # Plot contour surfaces
-        A = ax.contourf(
-        X[:, 0, :], datacube[:, 0, :], Z[:, 0, :],
-        zdir='y', offset=Y.min(), **kw
-        )
-        B = ax.contourf(
-            X[:, :, -1], Y[:, :, -1], datacube[:, :, -1],
-            zdir='z', offset=Z.max(), **kw
-        )
-        C = ax.contourf(
-            datacube[-1, :, :], Y[-1, :, :], Z[-1, :, :],
-            zdir='x', offset=X.max(), **kw
-        )
+        A = _plot_face(Xxz, Zxz, face_y, 'y', ymin)
+        B = _plot_face(Xxy, Yxy, face_z, 'z', zmax)
+        C = _plot_face(Yyz, Zyz, face_x, 'x', xmax)
         # Plot edges
         ax.plot([xmax, xmax], [ymin, ymin], [zmin, zmax], **edges_kw)
         ax.plot([xmax, xmax], [ymax, ymax], [zmin, zmax], **edges_kw)
@@ -61,19 +124,16 @@ def plot_contour_box(ax, x, y, z, datacube, gravity):
         aspectratio_x, aspectratio_z, aspectratio_y = int(nxsl/nzsl), 1, int(nysl/nzsl)
         ax.set_box_aspect([aspectratio_x, aspectratio_y, aspectratio_z], zoom=1)
     elif gravity == 'y':
+        # Materialize each face once: matplotlib traverses the data
+        # several times (levels, norm), and the transposed views would
+        # re-gather with large strides on every pass
+        face_y = np.ascontiguousarray(datacube[:, -1, :].T)
+        face_z = np.ascontiguousarray(datacube[0, :, :].T)
+        face_x = np.ascontiguousarray(datacube[:, :, -1].T)
         # Plot contour surfaces
-        A = ax.contourf(
-        X[:, -1, :], Z[:, -1, :], datacube[:, -1, :],
-        zdir='z', offset=Y.max(), **kw
-        )
-        B = ax.contourf(
-            X[:, :, 0], datacube[:, :, 0], Y[:, :, 0],
-            zdir='y', offset=Z.min(), **kw
-        )
-        C = ax.contourf(
-            datacube[-1, :, :], Z[-1, :, :], Y[-1, :, :],
-            zdir='x', offset=X.max(), **kw
-        )
+        A = _plot_face(Xxz, Zxz, face_y, 'z', ymax)
+        B = _plot_face(Xxy, Yxy, face_z, 'y', zmin)
+        C = _plot_face(Zyz, Yyz, face_x, 'x', xmax)
         # Plot edges
         ax.plot([xmax, xmax], [zmin, zmax], ymin, **edges_kw)
         ax.plot([xmax, xmax], [zmin, zmax], ymax, **edges_kw)
@@ -93,7 +153,9 @@ def plot_contour_box(ax, x, y, z, datacube, gravity):
         raise Exception("Invalide gravity. Choose 'y' or 'z'")
     
     fig = ax.get_figure()
-    cbar = fig.colorbar(A, ax=ax, orientation='horizontal', pad=-1.1, fraction=0.04)
+    # pre-colored surfaces carry no norm/cmap, so give the colorbar one
+    mappable = mpl.cm.ScalarMappable(norm=norm, cmap=cmap) if use_surface else A
+    cbar = fig.colorbar(mappable, ax=ax, orientation='horizontal', pad=-1.1, fraction=0.04)
     cbar.set_label(r"$\text{variable}$")  # or whatever label is appropriate
     # Set zoom and angle view
     ax.view_init(20, -45)
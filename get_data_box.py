@@ -50,8 +50,9 @@ parser.add_argument("--gravity", type=str, default="y", required=False, help="Di
 parser.add_argument("--Lh", type=float, default=1.0, required=False, help="Horizontal length of full box. See global.hpp")
 parser.add_argument("--Lv", type=float, default=0.5, required=False, help="Vertical length of full box. See global.hpp")
 # Method to extract sub-domain
-data_methods = ['seek', 'memmap', 'fromfile']
+data_methods = ['seek', 'memmap', 'fromfile', 'iouring', 'numba', 'gds']
 parser.add_argument("--method", type=str, default="memmap", required=False, choices=data_methods, help="Data loading method")
+parser.add_argument("--nthreads", type=int, default=1, required=False, help="Number of CPU threads for the memmap slab copies")
 # Subcube specifications
 parser.add_argument("--nxsl", type=int, default=32, required=False, help="Number of grid points in x dir for sampled data")
 parser.add_argument("--nysl", type=int, default=32, required=False, help="Number of grid points in y dir for sampled data")
@@ -76,15 +77,7 @@ if __name__ == '__main__':
     figname = f'{args.var}_PVsample-nx{int(args.nxsl)}ny{int(args.nysl)}nz{int(args.nzsl)}_nskip{args.nxskip}_t{args.rawdatasnap}_{args.method}'
     dpi_val = 200
     saveData = args.saveData
-
-    # ===============
-    # Get data
-    print(f'Loading snapshot: {args.var} {args.rawdatasnap}')
     data_sample = SSTData(args)
-    # check-sum for data file 
-    data_sample._check_data()
-    # get subdomain
-    datacube = data_sample._get_data()
 
     # ===============
     # Grid
@@ -92,19 +85,27 @@ if __name__ == '__main__':
     if args.gravity == 'y':
         y = get_1Dgrid(data_sample.Lv, data_sample.ny, data_sample.nyoffset, data_sample.nysl, data_sample.nyskip)
         z = get_1Dgrid(data_sample.Lh, data_sample.nz, data_sample.nzoffset, data_sample.nzsl, data_sample.nzskip)
-        if args.var == 'r' or args.var == 'rho':
-            # add ambient density (y * drhobardz) to perturbation density (r)
-            scalar = y * args.drhobar
-            datacube = datacube * scalar.reshape(1, args.nysl, 1)
     elif args.gravity == 'z':
         y = get_1Dgrid(data_sample.Lh, data_sample.ny, data_sample.nyoffset, data_sample.nysl, data_sample.nyskip)
         z = get_1Dgrid(data_sample.Lv, data_sample.nz, data_sample.nzoffset, data_sample.nzsl, data_sample.nzskip)
-        if args.var == 'r' or args.var == 'rho':
-            # add ambient density (y * drhobardz) to perturbation density (r)
-            scalar = z * args.drhobar
-            datacube = datacube * scalar.reshape(1, 1, args.nzsl)
     else:
         raise Exception("Gravity should be defined")
+
+    # ===============
+    # Get data
+    print(f'Loading snapshot: {args.var} {args.rawdatasnap}')
+    # check-sum for data file
+    data_sample._check_data()
+    # ambient density scaling, fused into the extraction pass
+    scale_axis, scale_vec = None, None
+    if args.var == 'r' or args.var == 'rho':
+        # add ambient density (y * drhobardz) to perturbation density (r)
+        if args.gravity == 'y':
+            scale_axis, scale_vec = 'y', y * args.drhobar
+        elif args.gravity == 'z':
+            scale_axis, scale_vec = 'z', z * args.drhobar
+    # get subdomain
+    datacube = data_sample._get_data(scale_axis=scale_axis, scale_vec=scale_vec)
     print(f"data shape: {datacube.shape}")
 
     # ===============
@@ -120,6 +121,14 @@ if __name__ == '__main__':
 
     # ===============
     # # Save data
-    if saveData: 
-        np.savez(f'{args.saveDataDir}{figname}.npz', datacube=datacube, x=x, y=y, z=z, args=args)
+    if saveData:
+        # Stream the cube straight into an on-disk .npy through a memmap,
+        # avoiding the full-size serialization buffer np.savez would
+        # allocate. The small grid arrays and args go in a separate .npz.
+        cube_out = np.lib.format.open_memmap(f'{args.saveDataDir}{figname}_datacube.npy', mode='w+',
+                                             dtype=datacube.dtype, shape=datacube.shape)
+        cube_out[...] = datacube
+        cube_out.flush()
+        del cube_out
+        np.savez(f'{args.saveDataDir}{figname}_grid.npz', x=x, y=y, z=z, args=args)
 